@@ -1,101 +1,322 @@
 import bibtexparser
 import logging
+import argparse
 from pathlib import Path
-from typing import List, Dict, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Set, Tuple, Iterator
 import re
 import unicodedata
-from difflib import SequenceMatcher
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Levenshtein
+
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+# ASCII characters _PUNCT_RE removes (punctuation and control codes), for str.translate
+_ASCII_STRIP_TABLE = dict.fromkeys(c for c in range(128) if _PUNCT_RE.match(chr(c)))
+
+# BibTeX tokens for the streaming reader used by read_bib_file
+_ENTRY_START_RE = re.compile(r'@\s*(\w+)\s*([{(])')
+_ENTRY_KEY_RE = re.compile(r'\s*([^\s,{}()]*)')
+_FIELD_NAME_RE = re.compile(r'([\w\-:.+/]+)\s*=\s*')
+_BARE_VALUE_RE = re.compile(r'[\w\-:.+/]+')
+_SEPARATOR_RE = re.compile(r'[\s,]*')
+_CONCAT_RE = re.compile(r'\s*#\s*')
+_BRACE_RE = re.compile(r'[{}]')
+_QUOTE_RE = re.compile(r'[{}"]')
+_PAREN_RE = re.compile(r'[{})]')
+_LINE_INDENT_RE = re.compile(r'\n\s*')
+
+# Separator between names in a BibTeX author list
+_AUTHOR_SEP_RE = re.compile(r'\s+and\s+', re.IGNORECASE)
+
+# Month macros, expanded the way bibtexparser's common_strings=True does
+_COMMON_STRINGS = {
+    'jan': 'January', 'feb': 'February', 'mar': 'March', 'apr': 'April',
+    'may': 'May', 'jun': 'June', 'jul': 'July', 'aug': 'August',
+    'sep': 'September', 'oct': 'October', 'nov': 'November', 'dec': 'December',
+}
+
+TITLE_THRESHOLD = 0.95
+AUTHOR_THRESHOLD = 0.8
+# Rows of a block scored per cdist call, bounding the dense score matrix
+CDIST_CHUNK_ROWS = 256
+# Spawning the read pool costs ~0.5s; the streaming parser reads ~10 MiB/s, so
+# smaller inputs finish serially before the workers are up
+PARALLEL_READ_MIN_BYTES = 8 << 20
+
+def _total_size(paths: List[Path]) -> int:
+    """Total size in bytes of the given files, counting unreadable ones as empty."""
+    total = 0
+    for path in paths:
+        try:
+            total += path.stat().st_size
+        except OSError:
+            pass
+    return total
+
+def _find_closing(text: str, pos: int, pattern: re.Pattern, closer: str) -> int:
+    """Return the index of the delimiter closing a group whose body starts at pos."""
+    depth = 0
+    for match in pattern.finditer(text, pos):
+        char = match.group()
+        if char == '{':
+            depth += 1
+        elif depth > 0 and char == '}':
+            depth -= 1
+        elif depth == 0 and char == closer:
+            return match.start()
+        elif char == '}':
+            break
+    raise ValueError(f"unbalanced value starting at offset {pos}")
+
+def _parse_bib_value(text: str, pos: int, macros: Dict[str, str]) -> Tuple[str, int]:
+    """Parse a (possibly #-concatenated) field value; return it and the position after it."""
+    parts = []
+    while True:
+        if text.startswith('{', pos):
+            end = _find_closing(text, pos + 1, _BRACE_RE, '}')
+            parts.append(text[pos + 1:end])
+            pos = end + 1
+        elif text.startswith('"', pos):
+            end = _find_closing(text, pos + 1, _QUOTE_RE, '"')
+            parts.append(text[pos + 1:end])
+            pos = end + 1
+        else:
+            match = _BARE_VALUE_RE.match(text, pos)
+            if not match:
+                raise ValueError(f"expected a value at offset {pos}")
+            # Numbers and unknown macros are kept verbatim
+            parts.append(macros.get(match.group().lower(), match.group()))
+            pos = match.end()
+        concat = _CONCAT_RE.match(text, pos)
+        if not concat:
+            return _LINE_INDENT_RE.sub('\n', ''.join(parts)), pos
+        pos = concat.end()
+
+def _parse_bib_fields(text: str, pos: int, closer: str, macros: Dict[str, str]) -> Tuple[Dict[str, str], int]:
+    """Parse name = value pairs up to the entry's closing delimiter."""
+    fields = {}
+    while True:
+        pos = _SEPARATOR_RE.match(text, pos).end()
+        if text.startswith(closer, pos):
+            return fields, pos + 1
+        name = _FIELD_NAME_RE.match(text, pos)
+        if not name:
+            raise ValueError(f"malformed field at offset {pos}")
+        value, pos = _parse_bib_value(text, name.end(), macros)
+        # Like bibtexparser, the first occurrence of a repeated field wins
+        fields.setdefault(name.group(1).lower(), value)
+
+def _configure_logging(log_level: int) -> None:
+    """Send log records to the run's log file and stderr.
+
+    Also the pool initializer: spawned workers start with logging unconfigured.
+    """
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('logs/bib_deduplication.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+def _without_cached_fields(entry: Dict) -> Dict:
+    """Copy of an entry without the '_'-prefixed fields cached during deduplication."""
+    return {key: value for key, value in entry.items() if not key.startswith('_')}
 
 class BibDeduplicator:
-    def __init__(self, log_level=logging.INFO):
+    def __init__(self, log_level=logging.WARNING):
         """Initialize the deduplicator with logging configuration."""
         # Create logs directory if it doesn't exist
         Path('logs').mkdir(exist_ok=True)
         
         # Set up logging
-        logging.basicConfig(
-            level=log_level,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('logs/bib_deduplication.log'),
-                logging.StreamHandler()
-            ]
-        )
+        _configure_logging(log_level)
         self.logger = logging.getLogger(__name__)
         
         # Create a separate file for duplicate entries
         self.duplicate_file = Path('duplicates.txt')
         # Clear the duplicates file at start
         self.duplicate_file.write_text('')
+        # Duplicate reports collected by log_duplicate and written out by deduplicate_entries
+        self._dup_records: List[str] = []
 
     def normalize_string(self, text: str) -> str:
         """Normalize strings for comparison by removing special characters and whitespace."""
         if not text:
             return ""
+        # ASCII text has nothing to decompose, so skip NFKD
+        if text.isascii():
+            text = text.lower().translate(_ASCII_STRIP_TABLE)
+            return ' '.join(text.split())
         # Convert to lowercase and normalize unicode characters
         text = unicodedata.normalize('NFKD', text.lower())
         # Remove special characters and extra whitespace
-        text = re.sub(r'[^\w\s]', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _PUNCT_RE.sub('', text)
+        text = _WS_RE.sub(' ', text).strip()
         return text
 
-    def calculate_similarity(self, str1: str, str2: str) -> float:
-        """Calculate similarity between two strings using SequenceMatcher."""
-        return SequenceMatcher(None, str1, str2).ratio()
+    def calculate_similarity(self, str1: str, str2: str, scorer=None, score_cutoff: float = 0.0) -> float:
+        """Calculate similarity between two strings as a 0-1 ratio.
+
+        Uses normalized Levenshtein similarity unless a RapidFuzz scorer is given.
+        Scores below score_cutoff come back as 0.0, letting the scorer stop early.
+        """
+        if scorer is None:
+            return Levenshtein.normalized_similarity(str1, str2, score_cutoff=score_cutoff)
+        return scorer(str1, str2, score_cutoff=score_cutoff * 100) / 100.0
+
+    def are_authors_similar(self, entry1: Dict, entry2: Dict,
+                            author_threshold: float = AUTHOR_THRESHOLD) -> bool:
+        """Check if two entries have similar author lists."""
+        # Author order varies between sources, so compare sorted tokens
+        author_similarity = self.calculate_similarity(entry1['_nauthor'], entry2['_nauthor'],
+                                                      scorer=fuzz.token_sort_ratio,
+                                                      score_cutoff=author_threshold)
+        return author_similarity > author_threshold
 
     def are_entries_similar(self, entry1: Dict, entry2: Dict, 
-                          title_threshold: float = 0.95,
-                          author_threshold: float = 0.8) -> bool:
+                          title_threshold: float = TITLE_THRESHOLD,
+                          author_threshold: float = AUTHOR_THRESHOLD) -> bool:
         """Check if two entries are similar based on title and author similarity."""
-        title1 = self.normalize_string(entry1.get('title', ''))
-        title2 = self.normalize_string(entry2.get('title', ''))
+        # Normalized fields are cached on the entries by deduplicate_entries
+        title1 = entry1['_ntitle']
+        title2 = entry2['_ntitle']
         
-        title_similarity = self.calculate_similarity(title1, title2)
+        # Edit similarity can never exceed the length ratio, so reject mismatched lengths outright
+        shorter, longer = sorted((len(title1), len(title2)))
+        if longer and shorter / longer <= title_threshold:
+            return False
+        
+        title_similarity = self.calculate_similarity(title1, title2, score_cutoff=title_threshold)
         
         if title_similarity > title_threshold:
             # Check authors if titles are similar
-            authors1 = self.normalize_string(entry1.get('author', ''))
-            authors2 = self.normalize_string(entry2.get('author', ''))
-            author_similarity = self.calculate_similarity(authors1, authors2)
-            
-            return author_similarity > author_threshold
+            return self.are_authors_similar(entry1, entry2, author_threshold)
         
         return False
 
-    def check_doi_duplicates(self, entries: List[Dict]) -> List[Tuple[Dict, Dict]]:
-        """Find entries with identical DOIs."""
-        doi_map = {}
+    def similar_title_pairs(self, titles: List[str],
+                            title_threshold: float = TITLE_THRESHOLD) -> Iterator[Tuple[int, int]]:
+        """Yield (i, j) positions with i < j whose titles are more similar than the threshold, in (i, j) order.
+
+        Scores are computed by RapidFuzz's multi-threaded cdist with the same
+        normalized Levenshtein metric as calculate_similarity. Titles are scored
+        in length order, each only against the longer titles inside its length window.
+        """
+        order = np.argsort([len(title) for title in titles], kind='stable')
+        sorted_titles = [titles[k] for k in order]
+        lengths = np.array([len(title) for title in sorted_titles])
+        # Edit similarity can never exceed shorter / longer length, so a title's
+        # candidates end at the first length whose ratio reaches the threshold
+        if title_threshold > 0:
+            window_end = np.searchsorted(lengths, lengths / title_threshold + 1e-9, side='left')
+        else:
+            window_end = np.full(len(lengths), len(lengths))
+        # Equal lengths always stay in the window (two empty titles are identical)
+        window_end = np.maximum(window_end, np.searchsorted(lengths, lengths, side='right'))
+
+        pairs = []
+        for start in range(0, len(sorted_titles), CDIST_CHUNK_ROWS):
+            stop = min(start + CDIST_CHUNK_ROWS, len(sorted_titles))
+            # Windows only grow with length, so the chunk's last row bounds its columns
+            end = int(window_end[stop - 1])
+            scores = process.cdist(sorted_titles[start:stop], sorted_titles[start:end],
+                                   scorer=Levenshtein.normalized_similarity,
+                                   score_cutoff=title_threshold, dtype=np.float64, workers=-1)
+            for row, col in np.argwhere(np.triu(scores > title_threshold, 1)):
+                first, second = sorted((int(order[start + row]), int(order[start + col])))
+                pairs.append((first, second))
+
+        # Report in input order so earlier entries are kept, as before the length sort
+        pairs.sort()
+        yield from pairs
+
+    def first_author_surname(self, authors: str) -> str:
+        """Return the surname of the first author in a BibTeX author list.
+
+        Handles both "Last, First" and "First Last" forms.
+        """
+        first_author = _AUTHOR_SEP_RE.split(authors.strip(), 1)[0]
+        if ',' in first_author:
+            return first_author.split(',', 1)[0]
+        tokens = first_author.split()
+        return tokens[-1] if tokens else ''
+
+    def blocking_key(self, entry: Dict) -> Tuple[str, str]:
+        """Bucket entries by year and first-author surname initial; only entries in the same bucket are compared."""
+        year = entry.get('year', '').strip() or 'unknown'
+        surname = self.normalize_string(self.first_author_surname(entry.get('author', '')))
+        return year, surname[:1]
+
+    def check_doi_duplicates(self, entries: List[Dict]) -> List[Tuple[int, int]]:
+        """Find entries with identical DOIs, as (original, duplicate) positions."""
         duplicates = []
+        first_seen: Dict[str, int] = {}
         
-        for entry in entries:
-            doi = entry.get('doi')
+        for i, entry in enumerate(entries):
+            doi = (entry.get('doi') or '').lower().strip()  # Normalize DOI
             if doi:
-                doi = doi.lower().strip()  # Normalize DOI
-                if doi in doi_map:
-                    duplicates.append((doi_map[doi], entry))
-                else:
-                    doi_map[doi] = entry
+                first = first_seen.setdefault(doi, i)
+                if first != i:
+                    duplicates.append((first, i))
                     
         return duplicates
 
+    def parse_bib_text(self, text: str) -> List[Dict]:
+        """Stream entries out of BibTeX source in the dict shape bibtexparser produces.
+
+        @string macros are expanded, @comment and @preamble blocks are skipped,
+        and a malformed entry is logged and skipped without losing the rest of the file.
+        """
+        entries = []
+        macros = dict(_COMMON_STRINGS)
+        pos = 0
+        while True:
+            start = _ENTRY_START_RE.search(text, pos)
+            if not start:
+                return entries
+            entry_type = start.group(1).lower()
+            closer = '}' if start.group(2) == '{' else ')'
+            pos = start.end()
+            try:
+                if entry_type in ('comment', 'preamble'):
+                    pos = _find_closing(text, pos, _BRACE_RE if closer == '}' else _PAREN_RE, closer) + 1
+                elif entry_type == 'string':
+                    fields, pos = _parse_bib_fields(text, pos, closer, macros)
+                    macros.update(fields)
+                else:
+                    key = _ENTRY_KEY_RE.match(text, pos)
+                    fields, pos = _parse_bib_fields(text, key.end(), closer, macros)
+                    # bibtexparser drops entries without any fields
+                    if fields:
+                        entries.append({**fields, 'ENTRYTYPE': entry_type, 'ID': key.group(1)})
+            except ValueError as e:
+                self.logger.warning(f"Skipping malformed @{entry_type} entry: {e}")
+
     def read_bib_file(self, file_path: Path) -> List[Dict]:
         """Read a .bib file and return its entries."""
         try:
             with open(file_path, 'r', encoding='utf-8') as bibtex_file:
-                parser = bibtexparser.bparser.BibTexParser(common_strings=True)
-                bib_database = bibtexparser.load(bibtex_file, parser=parser)
-                # Add source file information to each entry
-                for entry in bib_database.entries:
-                    entry['source_file'] = str(file_path)
-                self.logger.info(f"Successfully read {len(bib_database.entries)} entries from {file_path}")
-                return bib_database.entries
+                entries = self.parse_bib_text(bibtex_file.read())
+            # Add source file information to each entry
+            for entry in entries:
+                entry['source_file'] = str(file_path)
+            self.logger.info(f"Successfully read {len(entries)} entries from {file_path}")
+            return entries
         except Exception as e:
             self.logger.error(f"Error reading file {file_path}: {str(e)}")
             return []
 
     def log_duplicate(self, original_entry: Dict, duplicate_entry: Dict, method: str):
-        """Log duplicate entries with detailed information."""
-        duplicate_info = (
+        """Record a duplicate pair for the duplicates file written at the end of the run."""
+        self.logger.debug("Duplicate by %s: %s (%s) <-> %s (%s)", method,
+                          original_entry.get('ID'), original_entry.get('source_file', 'Unknown file'),
+                          duplicate_entry.get('ID'), duplicate_entry.get('source_file', 'Unknown file'))
+        
+        self._dup_records.append(
             f"\nDuplicate found by {method}:\n"
             f"  Original entry from: {original_entry.get('source_file', 'Unknown file')}\n"
             f"  Title: {original_entry.get('title', 'Unknown Title')}\n"
@@ -103,54 +324,78 @@ class BibDeduplicator:
             f"  Year: {original_entry.get('year', 'Unknown Year')}\n"
             f"  DOI: {original_entry.get('doi', 'No DOI')}\n"
             f"  Duplicate entry from: {duplicate_entry.get('source_file', 'Unknown file')}\n"
+            f"\nOriginal BibTeX entry:\n"
+            f"{_without_cached_fields(original_entry)}"
+            f"\n\nDuplicate BibTeX entry:\n"
+            f"{_without_cached_fields(duplicate_entry)}"
+            f"\n{'=' * 50}\n"
         )
-        self.logger.info(duplicate_info)
-        
-        # Write to duplicates file
-        with open(self.duplicate_file, 'a', encoding='utf-8') as f:
-            f.write(duplicate_info)
-            f.write("\nOriginal BibTeX entry:\n")
-            f.write(str(original_entry))
-            f.write("\n\nDuplicate BibTeX entry:\n")
-            f.write(str(duplicate_entry))
-            f.write("\n" + "="*50 + "\n")
 
     def deduplicate_entries(self, input_files: List[Path]) -> List[Dict]:
         """Process multiple .bib files and remove duplicates using multiple methods."""
         all_entries: List[Dict] = []
         duplicates_count = 0
-        removed_entries = set()  # Track entries to remove
         
-        # Read all input files
-        for file_path in input_files:
-            entries = self.read_bib_file(file_path)
-            all_entries.extend(entries)
+        # Parse files in worker processes once there is enough input to amortize them
+        if len(input_files) > 1 and _total_size(input_files) >= PARALLEL_READ_MIN_BYTES:
+            with ProcessPoolExecutor(initializer=_configure_logging,
+                                     initargs=(logging.getLogger().level,)) as executor:
+                for entries in executor.map(self.read_bib_file, input_files):
+                    all_entries.extend(entries)
+        else:
+            for file_path in input_files:
+                all_entries.extend(self.read_bib_file(file_path))
+        
+        # Track removed entries by position
+        removed = np.zeros(len(all_entries), dtype=bool)
+        
+        # Normalize the compared fields once per entry rather than once per pair
+        for entry in all_entries:
+            entry['_ntitle'] = self.normalize_string(entry.get('title', ''))
+            entry['_nauthor'] = self.normalize_string(entry.get('author', ''))
+        
+        # Collect duplicate reports and write them in one go at the end
+        self._dup_records = []
         
         # First check DOI duplicates
         doi_duplicates = self.check_doi_duplicates(all_entries)
-        for original, duplicate in doi_duplicates:
+        for i, j in doi_duplicates:
             duplicates_count += 1
-            removed_entries.add(id(duplicate))
-            self.log_duplicate(original, duplicate, "DOI match")
-        
-        # Then check similarity-based duplicates
-        for i in range(len(all_entries)):
-            if id(all_entries[i]) in removed_entries:
+            removed[j] = True
+            self.log_duplicate(all_entries[i], all_entries[j], "DOI match")
+
+        # Group entry positions into blocks so only plausible pairs are compared
+        blocks: Dict[Tuple[str, str], List[int]] = {}
+        for i, entry in enumerate(all_entries):
+            blocks.setdefault(self.blocking_key(entry), []).append(i)
+
+        # Then check similarity-based duplicates within each block
+        for positions in blocks.values():
+            if len(positions) < 2:
                 continue
-            for j in range(i + 1, len(all_entries)):
-                if id(all_entries[j]) in removed_entries:
+            titles = [all_entries[i]['_ntitle'] for i in positions]
+            for a, b in self.similar_title_pairs(titles):
+                i, j = positions[a], positions[b]
+                if removed[i] or removed[j]:
                     continue
-                if self.are_entries_similar(all_entries[i], all_entries[j]):
+                if self.are_authors_similar(all_entries[i], all_entries[j]):
                     duplicates_count += 1
-                    removed_entries.add(id(all_entries[j]))
+                    removed[j] = True
                     self.log_duplicate(all_entries[i], all_entries[j], "Title/Author similarity")
 
+        # The normalized fields were only needed for comparison
+        for entry in all_entries:
+            del entry['_ntitle'], entry['_nauthor']
+
+        with open(self.duplicate_file, 'a', encoding='utf-8') as f:
+            f.writelines(self._dup_records)
+
         # Create final list of unique entries
-        unique_entries = [entry for entry in all_entries if id(entry) not in removed_entries]
+        unique_entries = [entry for entry, is_removed in zip(all_entries, removed) if not is_removed]
         
-        self.logger.info(f"Found and removed {duplicates_count} duplicate entries")
-        self.logger.info(f"Retained {len(unique_entries)} unique entries")
-        self.logger.info(f"Detailed duplicate information written to {self.duplicate_file}")
+        self.logger.info("Found and removed %d duplicate entries", duplicates_count)
+        self.logger.info("Retained %d unique entries", len(unique_entries))
+        self.logger.info("Detailed duplicate information written to %s", self.duplicate_file)
         
         return unique_entries
 
@@ -172,8 +417,12 @@ class BibDeduplicator:
 
 def main():
     """Main function to run the deduplication process."""
+    parser = argparse.ArgumentParser(description="Deduplicate entries across .bib files.")
+    parser.add_argument('--verbose', action='store_true', help="log progress at INFO level")
+    args = parser.parse_args()
+    
     # Initialize deduplicator
-    deduplicator = BibDeduplicator()
+    deduplicator = BibDeduplicator(log_level=logging.INFO if args.verbose else logging.WARNING)
     
     # Get input files (you can modify this to accept command line arguments)
     input_directory = Path('files/Cleaned_Bib')
@@ -1,12 +1,16 @@
 import logging
 from pathlib import Path
-import unicodedata
 import re
-from typing import List, Dict, Set, Any
+from typing import List, Set
 import pandas as pd
-import pydash as py_
 import csv
 
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
+# All columns are kept for the output, so only type inference and NA detection are skipped
+CSV_READ_OPTIONS = {'engine': 'c', 'dtype': str, 'na_filter': False}
+
 class CSVDeduplicator:
     def __init__(self, comparison_columns: List[str], log_level=logging.DEBUG):  # Changed to DEBUG level
         """
@@ -35,37 +39,36 @@ class CSVDeduplicator:
         # Clear the duplicates file at start
         self.duplicate_file.write_text('')
 
-    def normalize_string(self, text: str) -> str:
-        """Normalize strings for comparison by removing special characters and whitespace."""
-        if pd.isna(text):  # Handle None/NaN values
-            return ""
-            
-        text = str(text)  # Convert to string
-        # Convert to lowercase and normalize unicode characters
-        text = unicodedata.normalize('NFKD', text.lower())
-        # Remove special characters and extra whitespace
-        text = re.sub(r'[^\w\s]', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+    def normalize_series(self, values: pd.Series) -> pd.Series:
+        """Normalize a column for comparison by removing special characters and whitespace."""
+        # Lowercase with Python's str.lower, as Arrow's case mapping differs (e.g. final sigma);
+        # compiled patterns keep Python's Unicode-aware \w even on Arrow-backed strings
+        return (
+            values.fillna('').astype(str)
+            .map(str.lower)
+            .str.normalize('NFKD')
+            .str.replace(_PUNCT_RE, '', regex=True)
+            .str.replace(_WS_RE, ' ', regex=True)
+            .str.strip()
+        )
 
-    def generate_comparison_key(self, row: Dict[str, Any]) -> str:
-        """Generate a unique comparison key from specified columns."""
+    def generate_comparison_keys(self, df: pd.DataFrame) -> pd.Series:
+        """Generate a comparison key per row from the specified columns."""
         key_parts = []
         for col in self.comparison_columns:
-            if col in row:
-                val = self.normalize_string(str(row[col]))
-                key_parts.append(val)
+            if col in df.columns:
+                key_parts.append(self.normalize_series(df[col]))
             else:
                 self.logger.warning(f"Column {col} not found in data")
-                key_parts.append("")
+                key_parts.append(pd.Series('', index=df.index))
         
-        return "_".join(key_parts)
+        return key_parts[0].str.cat(key_parts[1:], sep='_')
 
     def read_csv_file(self, file_path: Path) -> pd.DataFrame:
         """Read a CSV file and return its entries as a DataFrame."""
         try:
-            # Read CSV with utf-8 encoding
-            df = pd.read_csv(file_path, encoding='utf-8')
+            # Read CSV with utf-8 encoding; keep every cell as text to skip type inference
+            df = pd.read_csv(file_path, encoding='utf-8', **CSV_READ_OPTIONS)
             
             # Add source file information
             df['source_file'] = str(file_path)
@@ -76,7 +79,7 @@ class CSVDeduplicator:
         except UnicodeDecodeError:
             # Try alternative encoding if utf-8 fails
             try:
-                df = pd.read_csv(file_path, encoding='latin1')
+                df = pd.read_csv(file_path, encoding='latin1', **CSV_READ_OPTIONS)
                 df['source_file'] = str(file_path)
                 self.logger.info(f"Successfully read {len(df)} rows from {file_path} using latin1 encoding")
                 return df
@@ -89,47 +92,32 @@ class CSVDeduplicator:
             return pd.DataFrame()
                         
     def deduplicate_entries(self, input_files: List[Path]) -> pd.DataFrame:
-        """Process multiple CSV files and remove duplicates using pydash."""
-        all_data = pd.DataFrame()
-        duplicates_found = 0
+        """Process multiple CSV files and remove duplicates on the comparison key."""
+        frames = []
 
-        # Store all entries with their keys for debugging
-        all_entries_with_keys = []
-
-        # Read and process all input files
+        # Read all input files
         for file_path in input_files:
             df = self.read_csv_file(file_path)
-            if df.empty:
-                continue
-                
-            # Convert DataFrame to list of dictionaries for easier processing
-            entries = df.to_dict('records')
-            
-            # Generate and log comparison keys for debugging
-            for entry in entries:
-                key = self.generate_comparison_key(entry)
-                # self.logger.debug(f"\nEntry from {entry['source_file']}:")
-                # self.logger.debug(f"Title: {entry['Item Title']}")
-                # self.logger.debug(f"Authors: {entry['Authors']}")
-                # self.logger.debug(f"Year: {entry['Publication Year']}")
-                # self.logger.debug(f"Generated key: {key}")
-                all_entries_with_keys.append((key, entry))
+            if not df.empty:
+                frames.append(df)
 
-        # Group by keys
-        key_groups = py_.group_by(all_entries_with_keys, lambda x: x[0])
-        
-        # Process each group
-        for key, group in key_groups.items():
-            if len(group) > 1:
-                # We found duplicates
-                duplicates_found += len(group) - 1
-                original_entry = group[0][1]
-                duplicates = [g[1] for g in group[1:]]
-                
-                # Add first occurrence to result
-                all_data = pd.concat([all_data, pd.DataFrame([original_entry])], ignore_index=True)
-                
-                # Log duplicates
+        if not frames:
+            self.logger.info("No rows to deduplicate")
+            return pd.DataFrame()
+
+        combined = pd.concat(frames, ignore_index=True)
+        keys = self.generate_comparison_keys(combined)
+
+        # Keep the first row for each key
+        grouped = combined.groupby(keys, sort=False)
+        all_data = grouped.head(1).reset_index(drop=True)
+        duplicates_found = len(combined) - len(all_data)
+
+        # Report each key that occurs more than once: its first row against the rest
+        repeated = keys.duplicated(keep=False)
+        with open(self.duplicate_file, 'a', encoding='utf-8', buffering=1 << 16) as f:
+            for _, group in combined[repeated].groupby(keys[repeated], sort=False):
+                original_entry, *duplicates = group.to_dict('records')
                 for duplicate in duplicates:
                     duplicate_info = (
                         f"\nDuplicate found:\n"
@@ -143,16 +131,12 @@ class CSVDeduplicator:
                     self.logger.info(duplicate_info)
                     
                     # Write to duplicates file
-                    with open(self.duplicate_file, 'a', encoding='utf-8') as f:
-                        f.write(duplicate_info)
-                        f.write("\nOriginal row:\n")
-                        f.write(str(original_entry))
-                        f.write("\n\nDuplicate row:\n")
-                        f.write(str(duplicate))
-                        f.write("\n" + "="*50 + "\n")
-            else:
-                # Unique entry
-                all_data = pd.concat([all_data, pd.DataFrame([group[0][1]])], ignore_index=True)
+                    f.write(duplicate_info)
+                    f.write("\nOriginal row:\n")
+                    f.write(str(original_entry))
+                    f.write("\n\nDuplicate row:\n")
+                    f.write(str(duplicate))
+                    f.write("\n" + "="*50 + "\n")
 
         self.logger.info(f"Found and removed {duplicates_found} duplicate entries")
         self.logger.info(f"Retained {len(all_data)} unique entries")
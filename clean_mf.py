@@ -2,19 +2,57 @@ import pandas as pd
 import bibtexparser
 import logging
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import unicodedata
 import re
+import sys
+
+# Translation table deleting every non-spacing mark (category Mn)
+_COMBINING_MARKS = dict.fromkeys(
+    cp for cp in range(sys.maxunicode + 1) if unicodedata.category(chr(cp)) == 'Mn'
+)
+_NONWORD_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
+# Source column -> entry field, for each spreadsheet export format
+CSV_FIELDS = {
+    'Item Title': 'title',
+    'Authors': 'author',
+    'Publication Year': 'year',
+    'Item DOI': 'doi',
+    'Publication Title': 'journal',
+    'Journal Volume': 'volume',
+    'Journal Issue': 'number',
+    'URL': 'url',
+    'Book Series Title': 'series',
+    'Content Type': 'type',
+}
+EXCEL_FIELDS = {
+    'Article Title': 'title',
+    'Authors': 'author',
+    'Publication Year': 'year',
+    'DOI': 'doi',
+    'Source Title': 'journal',
+}
+
+# bibtexparser, the slowest reader here, manages ~0.1 MiB/s; below this much input
+# the files are read before a pool would finish spawning (~0.5s)
+PARALLEL_READ_MIN_BYTES = 128 << 10
+
+def _configure_logging():
+    # Workers run this too: under the spawn start method they inherit no handlers
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('logs/mf_deduplication.log'),
+            logging.StreamHandler()
+        ]
+    )
 
 class Deduplicator:
     def __init__(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('logs/mf_deduplication.log'),
-                logging.StreamHandler()
-            ]
-        )
+        _configure_logging()
         self.logger = logging.getLogger(__name__)
 
     def normalize_text(self, text):
@@ -22,38 +60,35 @@ class Deduplicator:
             return ""
         text = str(text).lower()
         text = unicodedata.normalize('NFKD', text)  # Decompose characters
-        text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')  # Remove non-spacing marks
-        text = re.sub(r'[^\w\s]', ' ', text)  # Replace non-alphanumeric characters with spaces
+        text = text.translate(_COMBINING_MARKS)  # Remove non-spacing marks
+        text = _NONWORD_RE.sub(' ', text)  # Replace non-alphanumeric characters with spaces
         return ' '.join(text.split())
 
+    def normalize_series(self, values):
+        # Vectorized normalize_text; str.lower matches its case mapping (Arrow's differs,
+        # e.g. final sigma) and compiled patterns keep Python's Unicode-aware \w
+        return (
+            values.fillna('').astype(str)
+            .map(str.lower)
+            .str.normalize('NFKD')
+            .str.translate(_COMBINING_MARKS)
+            .str.replace(_NONWORD_RE, ' ', regex=True)
+            .str.replace(_WS_RE, ' ', regex=True)
+            .str.strip()
+        )
+
+    def dataframe_to_entries(self, df, fields):
+        # Convert all rows at once; missing cells become empty strings
+        records = df[list(fields)].fillna('').astype(str).rename(columns=fields).to_dict('records')
+        return [{'ENTRYTYPE': 'article', 'ID': f'ref{idx}', **record} for idx, record in enumerate(records)]
 
     def read_csv(self, file_path):
         try:
-            df = pd.read_csv(file_path)
-            self.logger.info(f"CSV columns found: {list(df.columns)}")
-
-            entries = []
-            for idx, row in df.iterrows():
-                try:
-                    entry = {
-                        'ENTRYTYPE': 'article',
-                        'ID': f'ref{idx}',
-                        'title': str(row['Item Title']) if pd.notna(row['Item Title']) else '',
-                        'author': str(row['Authors']) if pd.notna(row['Authors']) else '',
-                        'year': str(row['Publication Year']) if pd.notna(row['Publication Year']) else '',
-                        'doi': str(row['Item DOI']) if pd.notna(row['Item DOI']) else '',
-                        'journal': str(row['Publication Title']) if pd.notna(row['Publication Title']) else '',
-                        'volume': str(row['Journal Volume']) if pd.notna(row['Journal Volume']) else '',
-                        'number': str(row['Journal Issue']) if pd.notna(row['Journal Issue']) else '',
-                        'url': str(row['URL']) if pd.notna(row['URL']) else '',
-                        'series': str(row['Book Series Title']) if pd.notna(row['Book Series Title']) else '',
-                        'type': str(row['Content Type']) if pd.notna(row['Content Type']) else ''
-                    }
-                    entries.append(entry)
-                except Exception as e:
-                    self.logger.warning(f"Error processing row {idx}: {e}")
-                    continue
-                    
+            # Only the mapped columns are needed; read them as plain text with empty cells as ''
+            df = pd.read_csv(file_path, engine='c', usecols=list(CSV_FIELDS), dtype=str, na_filter=False)
+            self.logger.info(f"CSV columns read: {list(df.columns)}")
+
+            entries = self.dataframe_to_entries(df, CSV_FIELDS)
             self.logger.info(f"Successfully processed {len(entries)} entries from CSV")
             return entries
             
@@ -67,23 +102,7 @@ class Deduplicator:
             df = pd.read_excel(file_path)
             self.logger.info(f"Excel columns found: {list(df.columns)}")
 
-            entries = []
-            for idx, row in df.iterrows():
-                try:
-                    entry = {
-                        'ENTRYTYPE': 'article',
-                        'ID': f'ref{idx}',
-                        'title': str(row['Article Title']) if pd.notna(row['Article Title']) else '',
-                        'author': str(row['Authors']) if pd.notna(row['Authors']) else '',
-                        'year': str(row['Publication Year']) if pd.notna(row['Publication Year']) else '',
-                        'doi': str(row['DOI']) if pd.notna(row['DOI']) else '',
-                        'journal': str(row['Source Title']) if pd.notna(row['Source Title']) else '',
-                    }
-                    entries.append(entry)
-                except Exception as e:
-                    self.logger.warning(f"Error processing row {idx}: {e}")
-                    continue
-                    
+            entries = self.dataframe_to_entries(df, EXCEL_FIELDS)
             self.logger.info(f"Successfully processed {len(entries)} entries from Excel")
             return entries
             
@@ -103,48 +122,55 @@ class Deduplicator:
             self.logger.error(f"Error reading BibTeX file {file_path}: {e}")
             return []
 
-    def are_duplicates(self, entry1, entry2):
-        # If DOIs exist and match
-        if entry1.get('doi') and entry2.get('doi'):
-            if entry1['doi'].strip() == entry2['doi'].strip():
-                return True
-
-        # Compare normalized titles
-        title1 = self.normalize_text(entry1.get('title', ''))
-        title2 = self.normalize_text(entry2.get('title', ''))
-        if title1 and title2 and title1 == title2:
-            return True
-            
-        return False
+    def read_file(self, file_path):
+        # Dispatch on the file extension
+        suffix = file_path.suffix.lower()
+        if suffix == '.bib':
+            return self.read_bibtex(file_path)
+        elif suffix == '.csv':
+            return self.read_csv(file_path)
+        elif suffix == '.xlsx':
+            return self.read_excel(file_path)
+        self.logger.warning(f"Unsupported file type: {file_path}")
+        return []
 
     def process_files(self, input_files):
         all_entries = []
         unique_entries = []
         duplicates = []
 
-        for file_path in input_files:
-            if file_path.suffix.lower() == '.bib':
-                entries = self.read_bibtex(file_path)
-            elif file_path.suffix.lower() == '.csv':
-                entries = self.read_csv(file_path)
-            elif file_path.suffix.lower() == '.xlsx':
-                entries = self.read_excel(file_path)
-            else:
-                self.logger.warning(f"Unsupported file type: {file_path}")
+        # Missing files add nothing here; read_file logs them
+        input_size = sum(path.stat().st_size for path in input_files if path.is_file())
+        if len(input_files) > 1 and input_size >= PARALLEL_READ_MIN_BYTES:
+            with ProcessPoolExecutor(initializer=_configure_logging) as executor:
+                for entries in executor.map(self.read_file, input_files):
+                    all_entries.extend(entries)
+        else:
+            for file_path in input_files:
+                all_entries.extend(self.read_file(file_path))
+
+        # Normalize all titles in one vectorized pass
+        titles = self.normalize_series(pd.Series([entry.get('title', '') for entry in all_entries], dtype=object))
+
+        # Index kept entries by DOI and normalized title for O(1) duplicate lookups
+        doi_index = {}
+        title_index = {}
+
+        for entry, title in zip(all_entries, titles):
+            doi = (entry.get('doi') or '').strip().lower()
+            original = doi_index.get(doi) if doi else None
+            if original is None and title:
+                original = title_index.get(title)
+
+            if original is not None:
+                duplicates.append((original, entry))
                 continue
 
-            if entries:
-                all_entries.extend(entries)
-
-        for entry in all_entries:
-            is_duplicate = False
-            for unique_entry in unique_entries:
-                if self.are_duplicates(entry, unique_entry):
-                    duplicates.append((unique_entry, entry))
-                    is_duplicate = True
-                    break
-            if not is_duplicate:
-                unique_entries.append(entry)
+            unique_entries.append(entry)
+            if doi:
+                doi_index[doi] = entry
+            if title:
+                title_index[title] = entry
 
         self.logger.info(f"Found {len(duplicates)} duplicates")
         self.logger.info(f"Kept {len(unique_entries)} unique entries")
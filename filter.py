@@ -1,8 +1,16 @@
 import pandas as pd
+import numpy as np
 import os
+import re
 from typing import List, Dict, Tuple
 from pathlib import Path
 
+try:
+    import ahocorasick  # provided by pyahocorasick
+    _AHOCORASICK_AVAILABLE = True
+except ImportError:
+    _AHOCORASICK_AVAILABLE = False
+
 
 class PaperFilter:
     def __init__(self):
@@ -33,6 +41,34 @@ class PaperFilter:
             'blockchain'
         ]
 
+        # One alternation per keyword list so a whole column is scanned in a single pass
+        self._incl_re = self._keyword_pattern(self.web_testing_keywords)
+        self._excl_re = self._keyword_pattern(self.exclusion_keywords)
+
+        # Aho-Corasick automata find any keyword in one pass over a title, whatever the list size
+        if _AHOCORASICK_AVAILABLE:
+            self._incl_ac = self._keyword_automaton(self.web_testing_keywords)
+            self._excl_ac = self._keyword_automaton(self.exclusion_keywords)
+
+    @staticmethod
+    def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+        """Compile keywords into a literal alternation matched against lowercased titles."""
+        return re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords))
+
+    @staticmethod
+    def _keyword_automaton(keywords: List[str]) -> 'ahocorasick.Automaton':
+        """Build an Aho-Corasick automaton over the lowercased keywords."""
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword.lower(), keyword)
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    def _contains_keyword(automaton: 'ahocorasick.Automaton', title: str) -> bool:
+        """Return True as soon as the automaton reports a keyword in the lowercased title."""
+        return next(automaton.iter(title), None) is not None
+
     def is_relevant_paper(self, title: str) -> bool:
         """
         Check if a paper is relevant based on its title.
@@ -47,6 +83,10 @@ class PaperFilter:
             return False
             
         title = title.lower()
+
+        if _AHOCORASICK_AVAILABLE:
+            return (self._contains_keyword(self._incl_ac, title)
+                    and not self._contains_keyword(self._excl_ac, title))
         
         # Check if any web testing keywords are present
         has_web_testing_keyword = any(
@@ -85,7 +125,18 @@ class PaperFilter:
             return pd.DataFrame(), pd.DataFrame()
 
         # Filter papers
-        relevant_mask = df['Item Title'].apply(self.is_relevant_paper)
+        # Same rule as is_relevant_paper, applied to the whole column at once; Python's
+        # str.lower rather than Arrow's utf8_lower, whose case mapping differs (e.g. 'İ')
+        titles = df['Item Title'].fillna('').astype(str).map(str.lower)
+        if _AHOCORASICK_AVAILABLE:
+            title_list = titles.tolist()
+            incl = np.fromiter((self._contains_keyword(self._incl_ac, t) for t in title_list),
+                               dtype=bool, count=len(title_list))
+            excl = np.fromiter((self._contains_keyword(self._excl_ac, t) for t in title_list),
+                               dtype=bool, count=len(title_list))
+            relevant_mask = pd.Series(incl & ~excl, index=df.index)
+        else:
+            relevant_mask = titles.str.contains(self._incl_re) & ~titles.str.contains(self._excl_re)
         relevant_papers = df[relevant_mask].copy()
         excluded_papers = df[~relevant_mask].copy()
 
@@ -3,6 +3,10 @@ from pathlib import Path
 from typing import List, Dict, Optional
 import logging
 import textwrap
+import numpy as np
+
+# Sort key for papers without a numeric year, placing them after all dated papers
+_UNKNOWN_YEAR = np.iinfo(np.int64).max
 
 class BibContentExtractor:
     def __init__(self):
@@ -36,19 +40,25 @@ class BibContentExtractor:
                 bib_database = bibtexparser.load(bibtex_file, parser=parser)
             
             # Extract content
-            papers = []
-            for entry in bib_database.entries:
-                paper = {
+            papers = [
+                {
                     'id': entry.get('ID', 'Unknown ID'),
                     'title': self.clean_text(entry.get('title', '')),
                     'abstract': self.clean_text(entry.get('abstract', '')),
                     'year': entry.get('year', 'N/A'),
                     'author': entry.get('author', 'N/A')
                 }
-                papers.append(paper)
+                for entry in bib_database.entries
+            ]
+            # Release the parsed database before sorting and formatting
+            del bib_database
             
-            # Sort by year and then title
-            papers.sort(key=lambda x: (x['year'], x['title']))
+            # Sort by year and then title in one stable numpy lexsort;
+            # years compare numerically and unknown years go last
+            years = np.array([int(p['year']) if p['year'].isdigit() else _UNKNOWN_YEAR for p in papers],
+                             dtype=np.int64)
+            titles = np.array([p['title'] for p in papers], dtype=str)
+            papers = [papers[i] for i in np.lexsort((titles, years))]
             
             self.logger.info(f"Successfully extracted content from {len(papers)} papers")
             return papers
@@ -70,33 +80,31 @@ class BibContentExtractor:
             wrap_width (int): Width for text wrapping (default: 80)
         """
         try:
+            # One wrapper serves every title and abstract
+            wrapper = textwrap.TextWrapper(width=wrap_width, initial_indent="  ", subsequent_indent="  ")
+
+            chunks = []
+            for i, paper in enumerate(papers, 1):
+                # Format paper information with nice formatting and text wrapping
+                wrapped_title = wrapper.fill(paper['title'])
+                if paper['abstract']:
+                    abstract_block = wrapper.fill(paper['abstract'])
+                else:
+                    abstract_block = "  [No abstract available]"
+
+                chunks.append(
+                    f"Paper {i}\n"
+                    f"{'=' * wrap_width}\n\n"
+                    f"Title:\n{wrapped_title}\n\n"
+                    f"Year: {paper['year']}\n"
+                    f"Authors: {paper['author']}\n\n"
+                    f"Abstract:\n{abstract_block}\n"
+                    f"\n{'-' * wrap_width}\n\n"
+                )
+
+            # Write all papers in one call
             with open(output_file, 'w', encoding='utf-8') as f:
-                for i, paper in enumerate(papers, 1):
-                    # Format paper information with nice formatting and text wrapping
-                    f.write(f"Paper {i}\n")
-                    f.write("="*wrap_width + "\n\n")
-                    
-                    # Title
-                    f.write("Title:\n")
-                    wrapped_title = textwrap.fill(paper['title'], width=wrap_width, 
-                                                initial_indent="  ", subsequent_indent="  ")
-                    f.write(f"{wrapped_title}\n\n")
-                    
-                    # Year and Author
-                    f.write(f"Year: {paper['year']}\n")
-                    f.write(f"Authors: {paper['author']}\n\n")
-                    
-                    # Abstract
-                    f.write("Abstract:\n")
-                    if paper['abstract']:
-                        wrapped_abstract = textwrap.fill(paper['abstract'], width=wrap_width, 
-                                                       initial_indent="  ", subsequent_indent="  ")
-                        f.write(f"{wrapped_abstract}\n")
-                    else:
-                        f.write("  [No abstract available]\n")
-                    
-                    # Separator between papers
-                    f.write("\n" + "-"*wrap_width + "\n\n")
+                f.writelines(chunks)
             
             self.logger.info(f"Successfully saved content to {output_file}")
         except Exception as e:
@@ -104,16 +112,24 @@ class BibContentExtractor:
 
     def generate_summary(self, papers: List[Dict[str, str]], output_file: Optional[str] = None) -> str:
         """Generate a summary of the papers."""
-        total_papers = len(papers)
-        papers_with_abstract = sum(1 for p in papers if p['abstract'])
-        years = sorted(set(p['year'] for p in papers if p['year'] != 'N/A'))
+        # Gather all counts in a single pass over the papers
+        total_papers = 0
+        papers_with_abstract = 0
+        years = set()
+        for p in papers:
+            total_papers += 1
+            if p['abstract']:
+                papers_with_abstract += 1
+            if p['year'] != 'N/A':
+                years.add(p['year'])
+        years = sorted(years)
         
         summary = f"""
 Summary of Extracted Papers
 ==========================
 Total number of papers: {total_papers}
 Papers with abstracts: {papers_with_abstract}
-Year range: {years[0]} - {years[-1] if years else 'N/A'}
+Year range: {years[0] if years else 'N/A'} - {years[-1] if years else 'N/A'}
         """
         
         if output_file:
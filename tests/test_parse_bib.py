@@ -0,0 +1,64 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import bibtexparser
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from clean import BibDeduplicator  # noqa: E402
+
+EDGE_CASES = r"""
+% a line comment outside any entry
+@comment{ignored {nested} text}
+@preamble{ "\newcommand{\foo}{bar}" }
+@string{ jn = "Journal of {Testing}" }
+@STRING{pub = {ACM}}
+
+@article{nested,
+  title = {A {Nested {Deep}} Title},
+  title = {Repeated fields keep the first value},
+  journal = jn,
+  publisher = pub # " Press",
+  month = mar,
+  year = 2020,
+  note = "quoted " # {braced} # " and " # jn
+}
+
+@misc{no_fields}
+
+@book(paren,
+  Author = {Doe, Jane and Roe, Rick},
+  pages = {1--10},
+  abstract = {Line one
+      line two}
+)
+"""
+
+
+class ParseBibTextTest(unittest.TestCase):
+    """The streaming reader must produce the same entries as bibtexparser."""
+
+    def setUp(self):
+        # BibDeduplicator creates its log and duplicates files in the working directory
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.deduplicator = BibDeduplicator()
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def assertMatchesBibtexparser(self, text):
+        parser = bibtexparser.bparser.BibTexParser(common_strings=True)
+        expected = bibtexparser.loads(text, parser=parser).entries
+        self.assertEqual(self.deduplicator.parse_bib_text(text), expected)
+
+    def test_edge_cases(self):
+        self.assertMatchesBibtexparser(EDGE_CASES)
+
+
+if __name__ == '__main__':
+    unittest.main()